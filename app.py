@@ -1,13 +1,25 @@
 import streamlit as st
 from pathlib import Path
 from dataclasses import dataclass, field
-from typing import Optional, Dict, List, Any, Union
+from typing import Optional, Dict, List, Any
+import gc
+import hashlib
 import json
+import shutil
 import config
 from loguru import logger
 
+# orjson serializes to bytes in native code, a few times faster than the
+# stdlib encoder; session saves run on the Streamlit script thread, so
+# this shaves latency off every Start/Stop click. Optional dependency.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from pdf_handler import PDFHandler
 from audio_reader import AudioReader
+from text_converter import TextConverter
 
 @dataclass
 class AppState:
@@ -15,7 +27,8 @@ class AppState:
     current_page: int = 1
     total_pages: int = 0
     is_playing: bool = False
-    pdf_text: List[str] = field(default_factory=list)
+    # List[str] for eagerly extracted documents, LazyPageText otherwise
+    pdf_text: Any = field(default_factory=list)
     speed: int = config.SPEED_DEFAULT
     volume: float = config.VOLUME_DEFAULT
     voice_idx: int = 0
@@ -29,6 +42,55 @@ class AppState:
     })
     cache_dir: Optional[Path] = None
 
+@st.cache_resource
+def get_audio_reader() -> AudioReader:
+    """Process-wide AudioReader shared across reruns.
+
+    Constructing one per render re-ran pyttsx3 driver init (hundreds of
+    milliseconds) several times per rerun; the cached instance also keeps
+    its background executor and voice list alive.
+    """
+    return AudioReader()
+
+@st.cache_resource
+def get_text_converter() -> TextConverter:
+    """Process-wide TextConverter shared across reruns.
+
+    The constructor probes the Tesseract binary, which is a subprocess
+    call; caching the instance runs that probe once and keeps the OCR
+    result caches warm for the whole session.
+    """
+    return TextConverter()
+
+@st.cache_data(max_entries=16)
+def _page_preview(pdf_key: str, page_number: int) -> str:
+    """Page text for the preview area, cached per (document, page).
+
+    Revisited pages skip extraction entirely on rerun; max_entries keeps
+    the cache to a handful of recently viewed pages. pdf_key ties entries
+    to the loaded document so a new upload can't serve stale text.
+    """
+    return st.session_state.pdf_handler.get_page_text(page_number)
+
+def _hash_uploaded_file(uploaded_file) -> str:
+    """Stream-hash an upload in 1 MiB blocks without copying it whole."""
+    hasher = hashlib.sha256()
+    uploaded_file.seek(0)
+    for block in iter(lambda: uploaded_file.read(1 << 20), b''):
+        hasher.update(block)
+    uploaded_file.seek(0)
+    return hasher.hexdigest()
+
+def _page_audio_path(pdf_key: str, page_number: int) -> Path:
+    """Cache path for a synthesized page WAV.
+
+    The name includes the TTS settings so speed/volume/voice changes
+    invalidate stale audio.
+    """
+    state = st.session_state.state
+    name = f"{pdf_key}_p{page_number}_s{state.speed}_v{state.volume}_vc{state.voice_idx}.wav"
+    return state.cache_dir / "audio" / name
+
 def save_session_state():
     """Save current session state to disk."""
     try:
@@ -41,8 +103,11 @@ def save_session_state():
             'last_session': st.session_state.state.last_session
         }
         session_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(session_file, 'w') as f:
-            json.dump(state_data, f)
+        if orjson is not None:
+            session_file.write_bytes(orjson.dumps(state_data))
+        else:
+            with open(session_file, 'w') as f:
+                json.dump(state_data, f)
         logger.debug("Session state saved successfully")
     except Exception as e:
         logger.error(f"Error saving session state: {str(e)}")
@@ -52,8 +117,8 @@ def load_session_state() -> Dict[str, Any]:
     try:
         session_file = Path(config.CACHE_DIR) / "session_state.json"
         if session_file.exists():
-            with open(session_file, 'r') as f:
-                state_data = json.load(f)
+            data = session_file.read_bytes()
+            state_data = orjson.loads(data) if orjson is not None else json.loads(data)
             logger.info("Previous session state loaded")
             return state_data
     except Exception as e:
@@ -108,20 +173,54 @@ def main():
         uploaded_file = st.file_uploader("Upload PDF", type=['pdf'])
         
         if uploaded_file is not None:
-            pdf_handler = PDFHandler()
-            
-            # Save uploaded file
-            temp_dir = st.session_state.state.cache_dir / "temp"
-            temp_dir.mkdir(exist_ok=True)
-            temp_path = temp_dir / uploaded_file.name
-            
-            with open(temp_path, "wb") as f:
-                f.write(uploaded_file.getvalue())
-            
-            if pdf_handler.load_pdf(temp_path):
-                st.session_state.state.total_pages = pdf_handler.total_pages
-                st.session_state.state.pdf_text = pdf_handler.extract_all_text()
-                
+            # file_id is assigned per upload, so the rerun gate is a
+            # string compare instead of re-hashing the whole file on
+            # every widget interaction; older Streamlit falls back to
+            # the content hash
+            file_key = getattr(uploaded_file, 'file_id', None) or _hash_uploaded_file(uploaded_file)
+
+            # The uploader keeps returning the same file after "Close
+            # PDF"; the closed marker keeps this branch from silently
+            # reloading it until the user picks a file again
+            if (st.session_state.get('loaded_file_key') != file_key
+                    and st.session_state.get('closed_file_key') != file_key):
+                # Release the previous document before loading the new
+                # one; session state is never freed by Streamlit itself
+                old_handler = st.session_state.pop('pdf_handler', None)
+                if old_handler is not None:
+                    old_handler.close()
+                st.session_state.state.pdf_text = []
+                gc.collect()
+
+                # Content hash keys the audio/preview caches across
+                # sessions; computed once per load, not per rerun
+                pdf_hash = _hash_uploaded_file(uploaded_file)
+
+                pdf_handler = PDFHandler()
+                # Parse the upload in memory; no disk round-trip
+                if pdf_handler.load_pdf(uploaded_file):
+                    # Keep the handler open for the session; pages are
+                    # extracted lazily as playback/preview reach them
+                    st.session_state.pdf_handler = pdf_handler
+                    st.session_state.state.total_pages = pdf_handler.total_pages
+                    st.session_state.state.pdf_text = pdf_handler.lazy_text()
+                    st.session_state.loaded_pdf_hash = pdf_hash
+                    st.session_state.loaded_file_key = file_key
+                    st.session_state.pop('closed_file_key', None)
+
+                    # pdf2image shells out to Poppler, which needs a real
+                    # file; materialize one only when OCR can actually run
+                    if get_text_converter().is_ocr_available():
+                        temp_dir = st.session_state.state.cache_dir / "temp"
+                        temp_dir.mkdir(exist_ok=True)
+                        temp_path = temp_dir / uploaded_file.name
+                        uploaded_file.seek(0)
+                        with open(temp_path, "wb") as f:
+                            shutil.copyfileobj(uploaded_file, f, length=1 << 20)
+                        st.session_state.pdf_temp_path = temp_path
+
+            if st.session_state.state.pdf_text:
+
                 # Speed control
                 st.session_state.state.speed = st.slider(
                     "Reading Speed",
@@ -141,7 +240,7 @@ def main():
                 )
                 
                 # Voice selection
-                audio_reader = AudioReader()
+                audio_reader = get_audio_reader()
                 voices = audio_reader.voices
                 voice_names = [voice.name for voice in voices]
                 selected_voice = st.selectbox(
@@ -164,7 +263,7 @@ def main():
                 col1, col2 = st.columns(2)
                 with col1:
                     if st.button("Start Reading"):
-                        audio_reader = AudioReader()
+                        audio_reader = get_audio_reader()
                         audio_reader.set_properties(
                             st.session_state.state.speed,
                             st.session_state.state.volume,
@@ -173,15 +272,68 @@ def main():
                         st.session_state.state.current_page = page_number
                         st.session_state.state.is_playing = True
                         save_session_state()
-                        audio_reader.read_pages(
+                        audio_reader.read_pages_async(
                             st.session_state.state.pdf_text,
-                            start_page=page_number
+                            start_page=page_number,
+                            text_converter=get_text_converter(),
+                            pdf_path=st.session_state.get('pdf_temp_path')
                         )
                 
                 with col2:
                     if st.button("Stop"):
+                        # Playback runs on the reader's executor; only
+                        # stop() reaches its is_playing flag and engine
+                        get_audio_reader().stop()
                         st.session_state.state.is_playing = False
                         save_session_state()
+
+                # Pre-synthesized page audio: playable/scrubbable via the
+                # browser, with the next page rendered in the background
+                if st.button("Generate Page Audio"):
+                    audio_reader = get_audio_reader()
+                    if audio_reader.is_playing:
+                        # The shared engine is busy inside runAndWait on
+                        # the playback executor; synthesis would fail
+                        st.warning("Stop playback before generating page audio")
+                    else:
+                        pdf_key = st.session_state.loaded_pdf_hash[:16]
+                        audio_reader.set_properties(
+                            st.session_state.state.speed,
+                            st.session_state.state.volume,
+                            st.session_state.state.voice_idx
+                        )
+                        wav_path = _page_audio_path(pdf_key, page_number)
+                        if not wav_path.exists():
+                            with st.spinner("Synthesizing page audio..."):
+                                audio_reader.synthesize_to_file(
+                                    st.session_state.state.pdf_text[page_number - 1],
+                                    wav_path
+                                )
+                        if wav_path.exists():
+                            st.audio(str(wav_path), format='audio/wav')
+                        # Pre-render the next page while this one plays
+                        if page_number < st.session_state.state.total_pages:
+                            next_path = _page_audio_path(pdf_key, page_number + 1)
+                            if not next_path.exists():
+                                audio_reader.prefetch_audio(
+                                    st.session_state.state.pdf_text[page_number],
+                                    next_path
+                                )
+
+                if st.button("Close PDF"):
+                    closed_handler = st.session_state.pop('pdf_handler', None)
+                    if closed_handler is not None:
+                        closed_handler.close()
+                    st.session_state.state.pdf_text = []
+                    st.session_state.state.total_pages = 0
+                    st.session_state.state.current_page = 1
+                    st.session_state.state.is_playing = False
+                    st.session_state.pop('loaded_pdf_hash', None)
+                    st.session_state.pop('loaded_file_key', None)
+                    st.session_state.pop('pdf_temp_path', None)
+                    st.session_state.closed_file_key = file_key
+                    gc.collect()
+                    st.rerun()
     
     # Main content area
     if st.session_state.state.pdf_text:
@@ -189,7 +341,10 @@ def main():
         if st.session_state.state.current_page <= len(st.session_state.state.pdf_text):
             st.text_area(
                 "Text Content",
-                st.session_state.state.pdf_text[st.session_state.state.current_page - 1],
+                _page_preview(
+                    st.session_state.loaded_pdf_hash[:16],
+                    st.session_state.state.current_page
+                ),
                 height=300
             )
     else:
@@ -1,11 +1,55 @@
 import pyttsx3
-from typing import List, Optional, Dict
+import re
+import threading
+from pathlib import Path
+from typing import List, Optional, Sequence
+from concurrent.futures import Future, ThreadPoolExecutor
 import streamlit as st
 from loguru import logger
 import config
 import time
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+_SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+
+# Placeholder prefixes that mark a page as unreadable; str.startswith
+# accepts a tuple and runs the comparisons in C, and new sentinels only
+# need to be added here
+_SKIP_SENTINELS = ('[No text found', '[OCR failed', '[Empty page')
+
+def _chunk_text(text: str, max_chars: int = 500) -> List[str]:
+    """Split text into sentence-aligned chunks of at most max_chars.
+
+    A sentence longer than max_chars is emitted whole rather than broken
+    mid-word.
+    """
+    chunks = []
+    current = []
+    length = 0
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        if not sentence:
+            continue
+        if length and length + len(sentence) + 1 > max_chars:
+            chunks.append(' '.join(current))
+            current = []
+            length = 0
+        current.append(sentence)
+        length += len(sentence) + 1
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
+
+@st.cache_resource
+def _get_tts_engine():
+    """Create the pyttsx3 engine and voice list once per process.
+
+    Driver init (SAPI/NSSpeechSynth/eSpeak) costs hundreds of
+    milliseconds and can leak COM objects when repeated; reruns share the
+    cached engine and only re-apply mutable properties.
+    """
+    engine = pyttsx3.init()
+    return engine, engine.getProperty('voices')
+
 class AudioReader:
     """Handle text-to-speech functionality."""
     
@@ -17,6 +61,15 @@ class AudioReader:
         self.error_count = 0
         self.last_error_time = 0
         self.recovery_attempts = 0
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        # WAV prefetch gets its own worker so rendering page N+1 doesn't
+        # queue behind an active read_pages run on the playback executor
+        self._synth_executor = ThreadPoolExecutor(max_workers=1)
+        self._playback_future: Optional[Future] = None
+        self._last_props = None
+        # The cached engine is shared by the playback and synth paths;
+        # pyttsx3 raises if two run loops are driven at once
+        self._engine_lock = threading.Lock()
         logger.info("Initializing AudioReader")
         self.initialize_engine()
         
@@ -24,10 +77,11 @@ class AudioReader:
     def initialize_engine(self) -> bool:
         """Initialize the text-to-speech engine with retry logic."""
         try:
-            self.engine = pyttsx3.init()
-            self.voices = self.engine.getProperty('voices')
+            self.engine, self.voices = _get_tts_engine()
             self.engine.setProperty('rate', config.SPEED_DEFAULT)
             self.engine.setProperty('volume', config.VOLUME_DEFAULT)
+            # Fresh engine, so the dedupe baseline no longer holds
+            self._last_props = None
             self.error_count = 0
             logger.info("Text-to-speech engine initialized successfully")
             return True
@@ -60,7 +114,8 @@ class AudioReader:
                 except:
                     pass
                     
-            # Reinitialize engine
+            # Drop the cached engine so reinitialization builds a fresh one
+            _get_tts_engine.clear()
             return self.initialize_engine()
             
         except Exception as e:
@@ -68,44 +123,93 @@ class AudioReader:
             return False
             
     def set_properties(self, speed: int, volume: float, voice_idx: int):
-        """Set the engine properties."""
+        """Set the engine properties, skipping ones already applied.
+
+        Each setProperty is a driver round-trip (a COM call on SAPI), and
+        the voice switch additionally reloads voice data, so only the
+        properties that actually changed since the last call are pushed.
+        """
         if not self.engine:
             logger.error("Cannot set properties: Engine not initialized")
             return
-            
+
+        last = self._last_props or (None, None, None)
         try:
-            self.engine.setProperty('rate', speed)
-            self.engine.setProperty('volume', volume)
-            if self.voices and 0 <= voice_idx < len(self.voices):
+            if speed != last[0]:
+                self.engine.setProperty('rate', speed)
+            if volume != last[1]:
+                self.engine.setProperty('volume', volume)
+            if (voice_idx != last[2] and self.voices
+                    and 0 <= voice_idx < len(self.voices)):
                 self.engine.setProperty('voice', self.voices[voice_idx].id)
+            self._last_props = (speed, volume, voice_idx)
             logger.debug(f"Engine properties set: speed={speed}, volume={volume}, voice={voice_idx}")
         except Exception as e:
             logger.error(f"Error setting engine properties: {str(e)}")
+            self._last_props = None
             self.recover_playback()
             
     def read_text(self, text: str) -> bool:
-        """Read the given text."""
+        """Read the given text, one sentence-aligned chunk at a time.
+
+        Handing the engine the whole page at once blocks runAndWait for
+        the full page and makes Stop take effect only at page boundaries.
+        Chunking keeps each say/runAndWait cycle to ~500 characters, so a
+        Stop request lands within a chunk of the current sentence.
+        """
         if not self.engine or not text:
             logger.error("Cannot read text: Engine not initialized or text is empty")
             return False
-            
+
+        interruptible = self.is_playing
+        for chunk in _chunk_text(text):
+            if interruptible and not self.is_playing:
+                logger.info("Playback interrupted mid-page")
+                break
+            if not self._speak_chunk(chunk):
+                return False
+        return True
+
+    def _speak_chunk(self, chunk: str) -> bool:
+        """Speak a single chunk, recovering and retrying once on failure."""
         try:
-            self.engine.say(text)
-            self.engine.runAndWait()
+            with self._engine_lock:
+                self.engine.say(chunk)
+                self.engine.runAndWait()
             return True
         except Exception as e:
             logger.error(f"Error during text reading: {str(e)}")
             if self.recover_playback():
-                # Retry once after recovery
                 try:
-                    self.engine.say(text)
-                    self.engine.runAndWait()
+                    with self._engine_lock:
+                        self.engine.say(chunk)
+                        self.engine.runAndWait()
                     return True
-                except:
+                except Exception:
                     pass
             return False
             
-    def read_pages(self, texts: List[str], start_page: int = 1):
+    def _resolve_page_text(self, texts: Sequence[str], page_number: int,
+                           text_converter=None, pdf_path: Optional[Path] = None) -> str:
+        """Get a page's text, falling back to OCR for scanned/empty pages.
+
+        Runs inside the one-ahead prefetch, so the OCR of page N+1 is
+        hidden behind playback of page N; TextConverter's image-hash
+        cache makes repeat visits instant.
+        """
+        text = texts[page_number - 1]
+        if text and not text.startswith(_SKIP_SENTINELS):
+            return text
+        if (text_converter is not None and pdf_path is not None
+                and text_converter.is_ocr_available()):
+            logger.info(f"Page {page_number} has no text layer, running OCR")
+            ocr_text = text_converter.extract_text_with_ocr(Path(pdf_path), page_number)
+            if ocr_text:
+                return ocr_text
+        return text
+
+    def read_pages(self, texts: Sequence[str], start_page: int = 1,
+                   text_converter=None, pdf_path: Optional[Path] = None):
         """Read multiple pages of text continuously."""
         if not texts:
             logger.error("No texts provided for reading")
@@ -113,28 +217,106 @@ class AudioReader:
             
         self.is_playing = True
         self.current_page = start_page
+        total_pages = len(texts)
         logger.info(f"Starting continuous reading from page {start_page}")
-        
-        while self.is_playing and self.current_page <= len(texts):
-            text = texts[self.current_page - 1]
-            if text and not text.startswith('[No text found'):
-                st.info(f"🔊 Reading page {self.current_page}")
-                logger.debug(f"Reading page {self.current_page}")
-                success = self.read_text(text)
-                if not success:
-                    logger.error(f"Failed to read page {self.current_page}")
-                    if not self.recover_playback():
-                        break
-            else:
-                logger.warning(f"Skipping page {self.current_page}: No valid text")
-                
-            self.current_page += 1
-            
+
+        # One-ahead pipeline: extract page N+1 while page N is spoken, so
+        # lazily extracted documents have no inter-page silence. runAndWait
+        # releases the GIL while driving the audio device, letting the
+        # prefetch thread run concurrently.
+        prefetch_pool = ThreadPoolExecutor(max_workers=1)
+        ahead: Optional[Future] = None
+        try:
+            while self.is_playing and self.current_page <= total_pages:
+                if ahead is not None:
+                    try:
+                        text = ahead.result()
+                    except Exception as e:
+                        logger.error(f"Prefetch of page {self.current_page} failed: {str(e)}")
+                        text = texts[self.current_page - 1]
+                else:
+                    text = self._resolve_page_text(
+                        texts, self.current_page, text_converter, pdf_path
+                    )
+
+                ahead = None
+                if self.current_page < total_pages:
+                    ahead = prefetch_pool.submit(
+                        self._resolve_page_text, texts, self.current_page + 1,
+                        text_converter, pdf_path
+                    )
+
+                # No st.* calls here: this runs on the executor thread,
+                # which has no ScriptRunContext; the app reads
+                # current_page/is_playing for progress instead
+                if text and not text.startswith(_SKIP_SENTINELS):
+                    logger.debug("Reading page {}", self.current_page)
+                    success = self.read_text(text)
+                    if not success:
+                        logger.error(f"Failed to read page {self.current_page}")
+                        if not self.recover_playback():
+                            break
+                else:
+                    logger.warning(f"Skipping page {self.current_page}: No valid text")
+
+                self.current_page += 1
+        finally:
+            prefetch_pool.shutdown(wait=False)
+
         self.is_playing = False
-        if self.current_page > len(texts):
+        if self.current_page > total_pages:
             logger.info("Finished reading all pages")
-            st.success("Finished reading all pages")
             
+    def synthesize_to_file(self, text: str, path: Path) -> bool:
+        """Render text to a WAV file without playing it.
+
+        Refuses while playback is active: driving save_to_file against
+        an engine already inside runAndWait raises "run loop already
+        started" and produces nothing.
+        """
+        if not self.engine or not text:
+            logger.error("Cannot synthesize: Engine not initialized or text is empty")
+            return False
+        if self.is_playing:
+            logger.warning("Cannot synthesize while playback is active")
+            return False
+
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with self._engine_lock:
+                self.engine.save_to_file(text, str(path))
+                self.engine.runAndWait()
+            return path.exists()
+        except Exception as e:
+            logger.error(f"Error synthesizing audio to {path}: {str(e)}")
+            return False
+
+    def prefetch_audio(self, text: str, path: Path) -> Future:
+        """Synthesize a page to disk on the synth worker.
+
+        Used to render page N+1 while page N plays in the browser, so
+        page changes don't pay synthesis latency. Runs on its own
+        executor: the playback executor may be occupied by read_pages for
+        minutes at a time.
+        """
+        return self._synth_executor.submit(self.synthesize_to_file, text, path)
+
+    def read_pages_async(self, texts: Sequence[str], start_page: int = 1,
+                         text_converter=None, pdf_path: Optional[Path] = None) -> Optional[Future]:
+        """Run read_pages on the background executor.
+
+        pyttsx3's runAndWait blocks for the duration of playback; keeping it
+        off the Streamlit script thread lets the UI keep re-rendering (and
+        the Stop button stay responsive) while audio plays.
+        """
+        if self._playback_future and not self._playback_future.done():
+            logger.warning("Playback already in progress, ignoring new request")
+            return self._playback_future
+        self._playback_future = self.executor.submit(
+            self.read_pages, texts, start_page, text_converter, pdf_path
+        )
+        return self._playback_future
+
     def stop(self):
         """Stop the current reading."""
         logger.info("Stopping audio playback")
@@ -146,11 +328,12 @@ class AudioReader:
                 logger.error(f"Error stopping engine: {str(e)}")
                 
     def cleanup(self):
-        """Clean up resources."""
+        """Clean up resources.
+
+        stop() already halts the engine; a second engine.stop() here was
+        redundant and a known source of driver stalls.
+        """
         logger.info("Cleaning up AudioReader resources")
         self.stop()
-        if self.engine:
-            try:
-                self.engine.stop()
-            except Exception as e:
-                logger.error(f"Error during cleanup: {str(e)}")
+        self.executor.shutdown(wait=False)
+        self._synth_executor.shutdown(wait=False)
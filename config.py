@@ -2,19 +2,29 @@ import streamlit as st
 import os
 import sys
 import psutil
-from pathlib import Path
 
-# Set page configuration
-st.set_page_config(
-    page_title="PDF to Audiobook Converter",
-    page_icon="📚",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Set page configuration. set_page_config may only run once per session
+# and only on the Streamlit script thread; this module is also imported
+# by extraction worker processes, where the call must not take the app
+# down with it.
+try:
+    st.set_page_config(
+        page_title="PDF to Audiobook Converter",
+        page_icon="📚",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+except Exception:
+    pass
 
 # File and path configurations
 CACHE_DIR = "cache"
-TESSERACT_PATH = os.path.join(os.path.dirname(sys.executable), 'pytesseract.exe')
+
+# Explicit Tesseract binary override; on other platforms the binary is
+# expected on PATH and pytesseract's default is left alone
+TESSERACT_PATH = os.environ.get('TESSERACT_CMD')
+if TESSERACT_PATH is None and os.name == 'nt':
+    TESSERACT_PATH = os.path.join(os.path.dirname(sys.executable), 'pytesseract.exe')
 
 # Default settings
 SPEED_DEFAULT = 175
@@ -34,10 +44,13 @@ MAX_CACHE_SIZE_MB = 500  # Maximum cache size in MB
 # Resource monitoring
 MEMORY_THRESHOLD_MB = 1000  # Warning threshold for memory usage
 
+# Constructing psutil.Process re-reads process metadata each time; one
+# handle for our own pid serves every check
+_PROCESS = psutil.Process(os.getpid())
+
 def check_memory_usage():
     """Check current memory usage and return warning if above threshold."""
-    process = psutil.Process(os.getpid())
-    memory_mb = process.memory_info().rss / 1024 / 1024
+    memory_mb = _PROCESS.memory_info().rss / 1024 / 1024
     if memory_mb > MEMORY_THRESHOLD_MB:
         return f"Warning: High memory usage ({memory_mb:.1f}MB)"
     return None
@@ -1,71 +1,382 @@
 import pdfplumber
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Optional, Dict
-import streamlit as st
+from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from operator import itemgetter
 from loguru import logger
-import gc
+import hashlib
+import io
+import json
 import os
+import tempfile
+import threading
 import time
-import shutil
 import config
 
+try:
+    import pypdfium2 as pdfium
+except ImportError:
+    pdfium = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# C-level dict lookup for the extract_words fallback join
+_word_text = itemgetter('text')
+
+# Maximum number of pages kept resident by the per-page text cache
+PAGE_CACHE_SIZE = 50
+
+def _extract_page_range(file_path: str, first_page: int, last_page: int) -> List[str]:
+    """Extract text for an inclusive 1-based page range (worker process).
+
+    Each worker opens its own document: neither pdfplumber nor PDFium
+    handles are picklable, and separate documents let the pure-Python
+    parsing run without sharing a GIL.
+    """
+    with PDFHandler() as handler:
+        if not handler.load_pdf(Path(file_path)):
+            return [""] * (last_page - first_page + 1)
+        return [
+            handler.extract_text(i) or ""
+            for i in range(first_page, last_page + 1)
+        ]
+
+class LazyPageText:
+    """Sequence-like view of a document's pages, extracted on demand.
+
+    Indexing and len() match the List[str] interface the reader and the
+    preview already use, but a page is only parsed when accessed and
+    stays subject to PDFHandler's bounded page cache — O(pages read)
+    work and memory instead of O(total pages).
+    """
+
+    def __init__(self, handler: 'PDFHandler'):
+        self._handler = handler
+
+    def __len__(self) -> int:
+        return self._handler.total_pages
+
+    def __bool__(self) -> bool:
+        return self._handler.total_pages > 0
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += self._handler.total_pages
+        if not 0 <= index < self._handler.total_pages:
+            raise IndexError(f"Page index {index} out of range")
+        return self._handler.get_page_text(index + 1)
+
 class PDFHandler:
     """Handle PDF document operations."""
     
     def __init__(self):
         self.pdf = None
+        self.pdf_fast = None
+        self.file_path = None
+        self._data = None
+        self._fast_lock = threading.Lock()
+        # Pages are fetched concurrently by the playback executor, its
+        # prefetch thread, and the Streamlit script thread
+        self._plumber_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
         self.total_pages = 0
         self.current_page = 1
         self.pdf_text = []
+        self._page_cache = OrderedDict()
+        self._extracted_text = {}
+        self._cache_key = None
+        self._pages_since_memcheck = 0
         self.last_cleanup = time.time()
         logger.info("Initializing PDFHandler")
         
-    def load_pdf(self, file_path: Path) -> bool:
-        """Load a PDF file and return success status."""
+    def load_pdf(self, source) -> bool:
+        """Load a PDF from a filesystem path or an in-memory file object.
+
+        Uploads are already byte buffers in memory; parsing them directly
+        skips the write-then-reread round-trip through the filesystem.
+        Both backends get their own zero-copy BytesIO view so their seek
+        positions can't interfere.
+        """
         try:
-            logger.info(f"Loading PDF: {file_path}")
+            logger.info(f"Loading PDF: {source}")
             self.cleanup_memory()  # Clean up before loading new PDF
-            self.pdf = pdfplumber.open(file_path)
-            self.total_pages = len(self.pdf.pages)
+            if isinstance(source, (str, Path)):
+                self.file_path = Path(source)
+            else:
+                self.file_path = None
+                source.seek(0)
+                self._data = source.read()
+            if pdfium is not None:
+                try:
+                    self.pdf_fast = pdfium.PdfDocument(
+                        str(self.file_path) if self._data is None else self._data
+                    )
+                except Exception as e:
+                    logger.warning(f"PDFium could not open {source}: {str(e)}")
+                    self.pdf_fast = None
+            if self.pdf_fast is not None:
+                self.total_pages = len(self.pdf_fast)
+            else:
+                # pdfplumber otherwise stays unopened until a page needs
+                # the fallback extractor
+                self.pdf = pdfplumber.open(
+                    self.file_path if self._data is None else io.BytesIO(self._data)
+                )
+                self.total_pages = len(self.pdf.pages)
             logger.info(f"Successfully loaded PDF with {self.total_pages} pages")
+            if self._data is not None:
+                self._cache_key = hashlib.blake2b(self._data, digest_size=16).hexdigest()
+            else:
+                self._cache_key = self._hash_file(self.file_path)
+            cached = self._load_text_cache()
+            if cached is not None:
+                logger.info("Loaded extracted text from disk cache")
+                self.pdf_text = cached
             self.cleanup_cache()  # Check and clean cache if needed
             return True
         except Exception as e:
             logger.error(f"Error loading PDF: {str(e)}")
             return False
             
+    @property
+    def is_loaded(self) -> bool:
+        """Whether a document is currently open in either backend."""
+        return self.pdf is not None or self.pdf_fast is not None
+
+    def _get_plumber_page(self, page_number: int):
+        """Open pdfplumber on demand and return the requested page.
+
+        PDFium handles most pages, so the pure-Python parser is only
+        instantiated the first time a page actually needs the fallback.
+        """
+        if self.pdf is None:
+            self.pdf = pdfplumber.open(
+                self.file_path if self._data is None else io.BytesIO(self._data)
+            )
+        return self.pdf.pages[page_number - 1]
+
     def extract_text(self, page_number: int) -> Optional[str]:
         """Extract text from a specific page."""
-        try:
-            if not self.pdf or page_number < 1 or page_number > self.total_pages:
-                logger.error(f"Invalid page number {page_number} or PDF not loaded")
+        if not self.is_loaded or page_number < 1 or page_number > self.total_pages:
+            logger.error(f"Invalid page number {page_number} or PDF not loaded")
+            return None
+
+        # Deferred formatting: loguru only renders the message if a sink
+        # accepts DEBUG, so this costs a level check per page at INFO
+        logger.debug("Extracting text from page {}", page_number)
+        text = self._extract_text_fast(page_number)
+        if not text:
+            try:
+                # pdfplumber/pdfminer objects are not thread-safe; the
+                # lock also keeps the lazy open from running twice
+                with self._plumber_lock:
+                    page = self._get_plumber_page(page_number)
+                    # Tight tolerances and layout=False skip most of pdfminer's
+                    # layout-analysis passes, which TTS output doesn't need
+                    text = page.extract_text(x_tolerance=2, y_tolerance=2, layout=False)
+                    if not text:
+                        words = page.extract_words(x_tolerance=2, y_tolerance=2)
+                        text = ' '.join(map(_word_text, words)) if words else None
+            except Exception as e:
+                logger.error(f"Error extracting text from page {page_number}: {str(e)}")
                 return None
-            
-            logger.debug(f"Extracting text from page {page_number}")
-            page = self.pdf.pages[page_number - 1]
-            text = page.extract_text()
-            if not text:
-                logger.warning(f"No text found on page {page_number}")
-            
-            # Check memory usage after extraction
+
+        if not text:
+            logger.warning(f"No text found on page {page_number}")
+            return None
+
+        # Sample memory every 32 pages: memory_info() is a syscall per
+        # call, and RSS doesn't move meaningfully page to page
+        if self._pages_since_memcheck & 31 == 0:
             memory_warning = config.check_memory_usage()
             if memory_warning:
                 logger.warning(memory_warning)
                 self.cleanup_memory()
-                
-            return text if text else None
+        self._pages_since_memcheck += 1
+
+        return text
+            
+    def _extract_text_fast(self, page_number: int) -> Optional[str]:
+        """Extract page text with PDFium's native text extractor.
+
+        pdfplumber rebuilds full layout objects per page in pure Python;
+        PDFium's C++ text page is several times faster when layout isn't
+        needed. Returns None when pypdfium2 is unavailable or the page
+        yields nothing, letting the pdfplumber path take over. PDFium is
+        not thread-safe, so access is serialized with a lock.
+        """
+        if not self.pdf_fast:
+            return None
+        try:
+            with self._fast_lock:
+                textpage = self.pdf_fast[page_number - 1].get_textpage()
+                try:
+                    text = textpage.get_text_bounded()
+                finally:
+                    textpage.close()
+            if not text:
+                return None
+            return text.strip() or None
         except Exception as e:
-            logger.error(f"Error extracting text from page {page_number}: {str(e)}")
+            logger.warning(f"PDFium extraction failed for page {page_number}: {str(e)}")
             return None
-            
+
+    @staticmethod
+    def _hash_file(file_path: Path) -> Optional[str]:
+        """Content hash used to key the on-disk extracted-text cache."""
+        try:
+            hasher = hashlib.blake2b(digest_size=16)
+            with open(file_path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    hasher.update(block)
+            return hasher.hexdigest()
+        except Exception as e:
+            logger.warning(f"Could not hash {file_path}: {str(e)}")
+            return None
+
+    def _text_cache_path(self) -> Optional[Path]:
+        """Path of the cached page-text file for the loaded document."""
+        if not self._cache_key:
+            return None
+        suffix = ".pages.json.zst" if zstandard is not None else ".pages.json"
+        return Path(config.CACHE_DIR) / f"{self._cache_key}{suffix}"
+
+    def _load_text_cache(self) -> Optional[List[str]]:
+        """Load previously extracted page text from disk, if present."""
+        path = self._text_cache_path()
+        if path is None or not path.exists():
+            return None
+        try:
+            data = path.read_bytes()
+            if path.suffix == '.zst':
+                data = zstandard.ZstdDecompressor().decompress(data)
+            pages = json.loads(data)
+            if isinstance(pages, list) and len(pages) == self.total_pages:
+                return pages
+            logger.warning(f"Discarding stale text cache {path}")
+        except Exception as e:
+            logger.warning(f"Failed to read text cache {path}: {str(e)}")
+        return None
+
+    def _store_text_cache(self, pages: List[str]):
+        """Atomically persist extracted page text for future sessions.
+
+        Page text is highly compressible, so it is zstd-compressed when
+        the zstandard package is installed.
+        """
+        path = self._text_cache_path()
+        if path is None:
+            return
+        try:
+            data = json.dumps(pages).encode('utf-8')
+            if path.suffix == '.zst':
+                data = zstandard.ZstdCompressor().compress(data)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            logger.debug(f"Stored extracted text cache at {path}")
+        except Exception as e:
+            logger.warning(f"Failed to write text cache {path}: {str(e)}")
+
+    def get_page_text(self, page_number: int) -> str:
+        """Return page text through a bounded LRU cache.
+
+        Holding every page of a large PDF in memory for the whole session
+        is the main driver of Streamlit RSS growth; this keeps at most
+        PAGE_CACHE_SIZE pages resident and re-extracts evicted ones on
+        demand. Extracted text is additionally accumulated as plain
+        strings - small next to the parser state the LRU bounds - so a
+        document read end to end is persisted to the disk text cache.
+        """
+        # A full extraction (from the disk cache or a preload) trumps the LRU
+        if len(self.pdf_text) == self.total_pages and self.total_pages:
+            return self.pdf_text[page_number - 1]
+
+        with self._cache_lock:
+            cached = self._page_cache.get(page_number)
+            if cached is not None:
+                self._page_cache.move_to_end(page_number)
+                return cached
+
+        # Extraction runs outside the lock; two threads missing on the
+        # same page at worst extract it twice
+        text = self.extract_text(page_number) or ""
+        complete = None
+        with self._cache_lock:
+            self._page_cache[page_number] = text
+            if len(self._page_cache) > PAGE_CACHE_SIZE:
+                self._page_cache.popitem(last=False)
+            self._extracted_text[page_number] = text
+            if self.total_pages and len(self._extracted_text) == self.total_pages:
+                complete = [self._extracted_text[i] for i in range(1, self.total_pages + 1)]
+                self._extracted_text = {}
+        if complete is not None:
+            self.pdf_text = complete
+            self._store_text_cache(complete)
+        return text
+
+    def lazy_text(self) -> LazyPageText:
+        """Return an on-demand page-text view of the loaded document."""
+        return LazyPageText(self)
+
     def extract_all_text(self) -> List[str]:
-        """Extract text from all pages."""
+        """Extract text from all pages, fanned out over worker processes.
+
+        Page parsing is CPU-bound and holds the GIL in the pdfplumber
+        fallback, so the document is split into contiguous page ranges and
+        each worker process extracts its range from its own copy of the
+        document. Short documents are extracted in-process, where pool
+        startup would cost more than it saves.
+        """
         logger.info("Starting text extraction from all pages")
-        self.pdf_text = []
+        if self.total_pages and len(self.pdf_text) == self.total_pages:
+            logger.info("Using previously extracted text")
+            return self.pdf_text
+
+        self.pdf_text = [""] * self.total_pages
+        if not self.is_loaded or not self.total_pages:
+            return self.pdf_text
+
+        workers = min(os.cpu_count() or 1, self.total_pages)
+        if workers > 1 and self.file_path is not None:
+            chunk_size = -(-self.total_pages // workers)  # ceil division
+            ranges = [
+                (lo, min(lo + chunk_size - 1, self.total_pages))
+                for lo in range(1, self.total_pages + 1, chunk_size)
+            ]
+            try:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    futures = {
+                        executor.submit(
+                            _extract_page_range, str(self.file_path), lo, hi
+                        ): (lo, hi)
+                        for lo, hi in ranges
+                    }
+                    failed_ranges = []
+                    for future in as_completed(futures):
+                        lo, hi = futures[future]
+                        try:
+                            self.pdf_text[lo - 1:hi] = future.result()
+                        except Exception:
+                            failed_ranges.append((lo, hi))
+                if failed_ranges:
+                    logger.error(f"Text extraction failed for page ranges {sorted(failed_ranges)}")
+                else:
+                    self._store_text_cache(self.pdf_text)
+                logger.info(f"Completed text extraction from {self.total_pages} pages")
+                return self.pdf_text
+            except Exception as e:
+                logger.warning(f"Process pool unavailable, extracting in-process: {str(e)}")
+
         for i in range(1, self.total_pages + 1):
-            text = self.extract_text(i) or ""
-            self.pdf_text.append(text)
-            logger.debug(f"Extracted {len(text)} characters from page {i}")
+            self.pdf_text[i - 1] = self.extract_text(i) or ""
+        self._store_text_cache(self.pdf_text)
         logger.info(f"Completed text extraction from {self.total_pages} pages")
         return self.pdf_text
         
@@ -74,10 +385,20 @@ class PDFHandler:
         logger.info("Cleaning up memory")
         if hasattr(self, 'pdf_text'):
             self.pdf_text = []
+        if hasattr(self, '_page_cache'):
+            self._page_cache.clear()
+        if hasattr(self, '_extracted_text'):
+            self._extracted_text = {}
         if self.pdf:
             self.pdf.close()
             self.pdf = None
-        gc.collect()
+        if self.pdf_fast:
+            self.pdf_fast.close()
+            self.pdf_fast = None
+        # Refcounting frees the parser objects as soon as the references
+        # above drop; a forced gc.collect() here cost a full generational
+        # sweep per handler lifecycle for nothing
+        self._data = None
         logger.debug("Memory cleanup completed")
         
     def cleanup_cache(self):
@@ -92,31 +413,35 @@ class PDFHandler:
                 
             logger.info("Starting cache cleanup")
             current_time = time.time()
-            total_size = 0
-            
-            # Remove old files and calculate total size
-            for file in cache_dir.glob('*'):
-                if file.is_file():
-                    file_age_days = (current_time - file.stat().st_mtime) / (24 * 3600)
-                    file_size_mb = file.stat().st_size / (1024 * 1024)
-                    total_size += file_size_mb
-                    
+            total_size = 0.0
+
+            # One scandir pass; DirEntry.stat() results are cached on the
+            # entry, so age, size, and the sort key reuse a single syscall
+            # per file instead of re-statting in each phase
+            remaining = []
+            with os.scandir(cache_dir) as it:
+                for entry in it:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    file_age_days = (current_time - stat.st_mtime) / (24 * 3600)
                     if file_age_days > config.CACHE_CLEANUP_DAYS:
-                        file.unlink()
-                        logger.debug(f"Removed old cache file: {file}")
-                        
+                        os.unlink(entry.path)
+                        logger.debug(f"Removed old cache file: {entry.path}")
+                        continue
+                    file_size_mb = stat.st_size / (1024 * 1024)
+                    total_size += file_size_mb
+                    remaining.append((stat.st_mtime, file_size_mb, entry.path))
+
             # If still over size limit, remove oldest files
             if total_size > config.MAX_CACHE_SIZE_MB:
-                files = sorted(cache_dir.glob('*'), key=lambda x: x.stat().st_mtime)
-                for file in files:
+                for mtime, file_size_mb, path in sorted(remaining):
                     if total_size <= config.MAX_CACHE_SIZE_MB:
                         break
-                    if file.is_file():
-                        file_size_mb = file.stat().st_size / (1024 * 1024)
-                        file.unlink()
-                        total_size -= file_size_mb
-                        logger.debug(f"Removed cache file due to size limit: {file}")
-                        
+                    os.unlink(path)
+                    total_size -= file_size_mb
+                    logger.debug(f"Removed cache file due to size limit: {path}")
+
             self.last_cleanup = time.time()
             logger.info("Cache cleanup completed")
             
@@ -128,7 +453,11 @@ class PDFHandler:
         logger.info("Closing PDF file")
         self.cleanup_memory()
         logger.debug("PDF file closed successfully")
-            
-    def __del__(self):
-        """Ensure PDF is closed on object destruction."""
+
+    # Context-manager support; a __del__ finalizer would keep PDFHandler
+    # cycles alive and run at unpredictable points during reruns
+    def __enter__(self) -> 'PDFHandler':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
         self.close()
@@ -1,5 +1,6 @@
 import pytest
 from pathlib import Path
+import pdf_handler
 from pdf_handler import PDFHandler
 
 def test_pdf_handler_initialization():
@@ -10,4 +11,11 @@ def test_pdf_handler_load_invalid_file():
     handler = PDFHandler()
     assert not handler.load_pdf(Path("nonexistent.pdf"))
 
+def test_get_page_text_cache_is_bounded():
+    handler = PDFHandler()
+    handler.extract_text = lambda page_number: f"page {page_number}"
+    for i in range(1, pdf_handler.PAGE_CACHE_SIZE + 20):
+        assert handler.get_page_text(i) == f"page {i}"
+    assert len(handler._page_cache) == pdf_handler.PAGE_CACHE_SIZE
+
 # Add more tests as needed
@@ -1,26 +1,200 @@
 from pathlib import Path
-import pytesseract
-from pdf2image import convert_from_path
-from PIL import Image
-import io
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import os
+import tempfile
+from typing import Dict, List, Optional
 from loguru import logger
 import config
 
+# The OCR stack (pytesseract, pdf2image, PIL, cv2/numba/numpy, tesserocr)
+# is imported lazily inside the methods that need it: Streamlit pays all
+# module import time on every cold start, and most sessions never OCR.
+
+# pytesseract can hang on very long image lists, so batch calls are chunked
+BATCH_CHUNK_SIZE = 50
+
+def _ocr_image_chunk(image_paths: List[str]) -> str:
+    """OCR a chunk of image paths in one Tesseract run.
+
+    Module-level so it is picklable for ProcessPoolExecutor workers; each
+    worker still amortizes Tesseract startup across its whole chunk via
+    the list-file invocation.
+    """
+    import pytesseract
+    if config.TESSERACT_PATH:
+        pytesseract.pytesseract.tesseract_cmd = config.TESSERACT_PATH
+
+    fd, list_file = tempfile.mkstemp(suffix='.txt', text=True)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join(image_paths))
+        return pytesseract.image_to_string(list_file)
+    finally:
+        os.unlink(list_file)
+
+np = None
+cv2 = None
+_binarize_local_mean = None
+_preprocess_backend_loaded = False
+
+def _load_preprocess_backend():
+    """Import the optional preprocessing stack on first use.
+
+    Sets the module-level np/cv2/_binarize_local_mean handles. Without
+    OpenCV, a Numba-compiled local-mean threshold (integral image for
+    O(1) neighbourhood means, prange across rows, cache=True so reruns
+    skip compilation) is prepared; without either, callers fall back to
+    plain grayscale.
+    """
+    global np, cv2, _binarize_local_mean, _preprocess_backend_loaded
+    if _preprocess_backend_loaded:
+        return
+    _preprocess_backend_loaded = True
+
+    try:
+        import numpy
+        np = numpy
+    except ImportError:
+        return
+
+    try:
+        import cv2 as _cv2
+        cv2 = _cv2
+        return
+    except ImportError:
+        pass
+
+    try:
+        from numba import njit, prange
+    except ImportError:
+        return
+
+    @njit(parallel=True, cache=True)
+    def binarize_local_mean(arr, window, offset):
+        h, w = arr.shape
+        integral = np.zeros((h + 1, w + 1), dtype=np.float64)
+        for y in range(h):
+            row_sum = 0.0
+            for x in range(w):
+                row_sum += arr[y, x]
+                integral[y + 1, x + 1] = integral[y, x + 1] + row_sum
+
+        out = np.empty_like(arr)
+        half = window // 2
+        for y in prange(h):
+            y0 = y - half if y - half > 0 else 0
+            y1 = y + half + 1 if y + half + 1 < h else h
+            for x in range(w):
+                x0 = x - half if x - half > 0 else 0
+                x1 = x + half + 1 if x + half + 1 < w else w
+                area = (y1 - y0) * (x1 - x0)
+                total = (integral[y1, x1] - integral[y0, x1]
+                         - integral[y1, x0] + integral[y0, x0])
+                if arr[y, x] < total / area - offset:
+                    out[y, x] = 0
+                else:
+                    out[y, x] = 255
+        return out
+
+    _binarize_local_mean = binarize_local_mean
+
 class TextConverter:
     """Convert PDF to text with OCR support."""
-    
+
     def __init__(self):
         self.tesseract_available = False
+        self._ocr_cache: Dict[str, str] = {}
+        self._ocr_cache_dir = Path(config.CACHE_DIR) / "ocr"
+        self._tess_api = None
+        self._tess_api_failed = False
         logger.info("Initializing TextConverter")
         try:
-            pytesseract.pytesseract.tesseract_cmd = config.TESSERACT_PATH
+            import pytesseract
+            if config.TESSERACT_PATH:
+                pytesseract.pytesseract.tesseract_cmd = config.TESSERACT_PATH
             pytesseract.get_tesseract_version()
             self.tesseract_available = True
             logger.info("Tesseract OCR initialized successfully")
         except Exception as e:
             logger.warning(f"Tesseract not available: {e}. OCR functionality will be disabled.")
-            
+
+    def _preprocess_image(self, image):
+        """Binarize a page image before OCR.
+
+        Grayscale plus adaptive thresholding cuts Tesseract's per-pixel
+        work and sharpens glyph/background separation. Falls back to plain
+        grayscale when OpenCV is not installed.
+        """
+        from PIL import Image
+
+        _load_preprocess_backend()
+        gray = image.convert('L')
+        if cv2 is not None:
+            # asarray reuses the PIL buffer; adaptiveThreshold is a single
+            # fused native kernel, so pixels are touched exactly once here
+            arr = np.asarray(gray, dtype=np.uint8)
+            bw = cv2.adaptiveThreshold(
+                arr, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10
+            )
+            return Image.fromarray(bw)
+        if _binarize_local_mean is not None:
+            arr = np.asarray(gray, dtype=np.uint8)
+            return Image.fromarray(_binarize_local_mean(arr, 31, 10))
+        return gray
+
+    def _get_tess_api(self):
+        """Lazily create the in-process tesserocr API, if the package is available."""
+        if self._tess_api_failed:
+            return None
+        if self._tess_api is None:
+            try:
+                from tesserocr import PyTessBaseAPI
+                self._tess_api = PyTessBaseAPI(lang='eng')
+                logger.info("tesserocr in-process API initialized")
+            except Exception as e:
+                logger.warning(f"tesserocr unavailable, using pytesseract: {str(e)}")
+                self._tess_api_failed = True
+                return None
+        return self._tess_api
+
+    def _ocr_image(self, image) -> str:
+        """Run OCR on a PIL image, preferring the in-process tesserocr API.
+
+        tesserocr keeps a single loaded Tesseract instance across pages,
+        avoiding the per-call process spawn and trained-data load that
+        pytesseract pays on every invocation.
+        """
+        api = self._get_tess_api()
+        if api is not None:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+        import pytesseract
+        return pytesseract.image_to_string(image)
+
+    def _cache_lookup(self, key: str) -> Optional[str]:
+        """Return a cached OCR result for the given image hash, if any."""
+        if key in self._ocr_cache:
+            return self._ocr_cache[key]
+        cache_file = self._ocr_cache_dir / f"{key}.txt"
+        if cache_file.exists():
+            try:
+                text = cache_file.read_text(encoding='utf-8')
+                self._ocr_cache[key] = text
+                return text
+            except Exception as e:
+                logger.warning(f"Failed to read OCR cache entry {key}: {str(e)}")
+        return None
+
+    def _cache_store(self, key: str, text: str):
+        """Store an OCR result in the in-memory and on-disk caches."""
+        self._ocr_cache[key] = text
+        try:
+            self._ocr_cache_dir.mkdir(parents=True, exist_ok=True)
+            (self._ocr_cache_dir / f"{key}.txt").write_text(text, encoding='utf-8')
+        except Exception as e:
+            logger.warning(f"Failed to write OCR cache entry {key}: {str(e)}")
+
     def extract_text_with_ocr(self, pdf_path: Path, page_number: int) -> Optional[str]:
         """Extract text from a PDF page using OCR."""
         if not self.tesseract_available:
@@ -28,6 +202,8 @@ class TextConverter:
             return None
             
         try:
+            from pdf2image import convert_from_path
+
             logger.info(f"Converting page {page_number} to image for OCR")
             # Convert PDF page to image
             images = convert_from_path(pdf_path, first_page=page_number, last_page=page_number)
@@ -35,18 +211,115 @@ class TextConverter:
                 logger.error(f"Failed to convert page {page_number} to image")
                 return None
                 
-            # Convert image to text using OCR
-            image = images[0]
-            logger.debug(f"Running OCR on page {page_number}")
-            text = pytesseract.image_to_string(image)
+            # Hash the rendered page so repeat OCRs of the same image are instant
+            image = self._preprocess_image(images[0])
+            key = hashlib.md5(image.tobytes()).hexdigest()
+
+            cached = self._cache_lookup(key)
+            if cached is not None:
+                logger.debug("OCR cache hit for page {}", page_number)
+                return cached if cached else None
+
+            logger.debug("Running OCR on page {}", page_number)
+            text = self._ocr_image(image)
+            text = text.strip() if text else ""
+            self._cache_store(key, text)
             if not text:
                 logger.warning(f"No text extracted from page {page_number} using OCR")
-            return text.strip() if text else None
+            return text if text else None
             
         except Exception as e:
             logger.error(f"Error during OCR conversion of page {page_number}: {str(e)}")
             return None
             
+    def extract_all_text_with_ocr(self, pdf_path: Path) -> List[str]:
+        """Extract text from every page with batched Tesseract invocations.
+
+        Tesseract accepts a text file listing image paths and processes all
+        of them in one run, amortizing its startup and model-load cost
+        across pages. Falls back to per-page OCR if the batch call fails.
+        """
+        if not self.tesseract_available:
+            logger.warning("OCR requested but Tesseract is not available")
+            return []
+
+        from pdf2image import convert_from_path
+        from PIL import Image
+
+        work_dir = self._ocr_cache_dir / "batch"
+        work_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            logger.info(f"Rendering pages of {pdf_path} for batch OCR")
+            # paths_only streams rendered pages to disk instead of holding
+            # N full-page images in memory; Poppler renders in parallel
+            image_paths = [
+                Path(p) for p in convert_from_path(
+                    pdf_path,
+                    dpi=200,
+                    thread_count=os.cpu_count() or 1,
+                    output_folder=str(work_dir),
+                    paths_only=True,
+                    fmt='png',
+                )
+            ]
+        except Exception as e:
+            logger.error(f"Failed to render {pdf_path} for batch OCR: {str(e)}")
+            return []
+
+        # Binarize in place so only one page is resident at a time
+        for image_path in image_paths:
+            with Image.open(image_path) as image:
+                processed = self._preprocess_image(image)
+            processed.save(image_path, format='PNG')
+
+        try:
+            chunks = [
+                [str(p) for p in image_paths[start:start + BATCH_CHUNK_SIZE]]
+                for start in range(0, len(image_paths), BATCH_CHUNK_SIZE)
+            ]
+            if len(chunks) > 1:
+                # Tesseract is single-threaded per invocation; OCR chunks
+                # in parallel worker processes, passing only paths across
+                # the process boundary
+                workers = min(os.cpu_count() or 1, len(chunks))
+                logger.debug(f"Running batch OCR in {workers} worker processes")
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    outputs = list(pool.map(_ocr_image_chunk, chunks))
+            else:
+                outputs = [_ocr_image_chunk(chunk) for chunk in chunks]
+
+            results: List[str] = []
+            for chunk, output in zip(chunks, outputs):
+                # Tesseract separates pages with a form feed
+                pages = output.split('\x0c')
+                results.extend(page.strip() for page in pages[:len(chunk)])
+            return results
+        except Exception as e:
+            logger.error(f"Batch OCR failed, falling back to per-page OCR: {str(e)}")
+            return [
+                self.extract_text_with_ocr(pdf_path, i) or ""
+                for i in range(1, len(image_paths) + 1)
+            ]
+        finally:
+            for image_path in image_paths:
+                try:
+                    image_path.unlink()
+                except OSError:
+                    pass
+
     def is_ocr_available(self) -> bool:
         """Check if OCR functionality is available."""
         return self.tesseract_available
+
+    def cleanup(self):
+        """Release the in-process Tesseract API, if one was created."""
+        if self._tess_api is not None:
+            try:
+                self._tess_api.End()
+            except Exception as e:
+                logger.error(f"Error closing tesserocr API: {str(e)}")
+            self._tess_api = None
+
+    def __del__(self):
+        """Ensure the Tesseract API is released on object destruction."""
+        self.cleanup()